@@ -1,21 +1,157 @@
 from __future__ import absolute_import, division
 import numpy as np
 import numba
-from hxmtpy.utils import numba_histogram, numba_glitch_filter
+from hxmtpy.utils import numba_histogram, numba_glitch_filter, _native
 from hxmtpy.log import Log
 
-class Events():
+def _column_property(name):
+    """
+    event column stored in the structure-of-arrays of Events,
+    the filtered columns are gathered from the parent array on first access
+    """
+    def getter(self):
+        if name in self._columns:
+            return self._columns[name]
+        if name in self._pending:
+            arr, index = self._pending.pop(name)
+            self._columns[name] = arr[index]
+            return self._columns[name]
+        raise AttributeError("%s data does not loaded, please use self.%s to load %s data"%(name, name, name))
+
+    def setter(self, value):
+        self._pending.pop(name, None)
+        self._columns[name] = _native(value)
+
+    return property(getter, setter)
 
-    def __init__(self, arr_events):
-        if arr_events.dtype == ">f8":
-            self.events = numba.float64(arr_events) # transfer big-endian dtype to non big-endian dtype
-        else:
-            self.events = arr_events
+class Events():
+    """
+    Structure-of-arrays container of events.
+
+    The columns (events, channel, detid, pulse_width) share storage with
+    their parents: slicing returns views of the parent arrays, boolean or
+    index filtering only records the selected indices and gathers a column
+    when it is first read.
+    """
+
+    __slots__ = ('_columns', '_pending')
+    column_names = ('events', 'channel', 'detid', 'pulse_width')
+
+    events = _column_property('events')
+    channel = _column_property('channel')
+    detid = _column_property('detid')
+    pulse_width = _column_property('pulse_width')
+
+    def __init__(self, arr_events, channel=None, detid=None, pulse_width=None, narrow=False):
+        """
+        initial Parameters
+        ---------------------
+        arr_events : array-like
+            The arrival time of events
+
+        channel, detid, pulse_width : array-like (optional)
+            The channel, detector id and pulse width of events
+
+        narrow : bool (optional)
+            narrow the dtypes of channel, detid and pulse_width (see narrow_dtypes)
+        """
+        self._columns = {}
+        self._pending = {}
+        self.events = arr_events
+        if channel is not None:
+            self.channel = channel
+        if detid is not None:
+            self.detid = detid
+        if pulse_width is not None:
+            self.pulse_width = pulse_width
+        if narrow:
+            self.narrow_dtypes()
+
+    def __len__(self):
+        if 'events' in self._columns:
+            return len(self._columns['events'])
+        return len(self._pending['events'][1])
+
+    def __getitem__(self, key):
+        """
+        slice (view) or filter (deferred gather) the events by
+        slice, bool array or index array, an integer index selects one event
+        """
+        if not isinstance(key, slice):
+            key = np.asarray(key)
+            if key.ndim == 0:
+                if not np.issubdtype(key.dtype, np.integer) or key.dtype == np.bool_:
+                    raise IndexError("only slice, integer, bool array or index array are valid indices")
+                key = int(key)
+                key = slice(key, key+1 if key != -1 else None)
+            else:
+                key = self._check_index(key)
+        new = object.__new__(type(self))
+        new._columns = {}
+        new._pending = {}
+        for name, arr in self._columns.items():
+            if isinstance(key, slice):
+                new._columns[name] = arr[key]
+            else:
+                new._pending[name] = (arr, key)
+        for name, (arr, index) in self._pending.items():
+            new._pending[name] = (arr, index[key])
+        return new
+
+    def _check_index(self, key):
+        """
+        check the bool or index array and convert it to the index array
+        """
+        nevents = len(self)
+        if key.size == 0:
+            key = key.astype(np.intp)
+        if key.ndim != 1:
+            raise IndexError("only 1-dimensional bool or index arrays are valid indices")
+        if key.dtype == np.bool_:
+            if len(key) != nevents:
+                raise IndexError("the length of bool array (%s) does not match the number of events (%s)"%(
+                    len(key), nevents))
+            return np.flatnonzero(key)
+        if not np.issubdtype(key.dtype, np.integer):
+            raise IndexError("arrays used as indices must be of integer or bool type")
+        if len(key) and ((np.min(key) < -nevents) or (np.max(key) >= nevents)):
+            raise IndexError("index out of bounds for %s events"%(nevents))
+        return np.where(key < 0, key + nevents, key).astype(np.intp, copy=False)
+
+    def time_slice(self, tstart, tstop):
+        """
+        select the events with tstart <= time < tstop, the events must be sorted by time.
+        The columns of returned Events are views of the parent arrays.
+        """
+        time = self.events
+        return self[np.searchsorted(time, tstart, side='left'):np.searchsorted(time, tstop, side='left')]
+
+    def narrow_dtypes(self):
+        """
+        narrow the dtypes of columns to save memory, channel and detid are
+        converted to the smallest unsigned integer (uint8 for HE channel and detid)
+        if they are integer columns, pulse_width is converted to float32. The events time is kept in float64.
+        """
+        for name in ('channel', 'detid'):
+            if hasattr(self, name):
+                arr = getattr(self, name)
+                if np.issubdtype(arr.dtype, np.integer) and len(arr) and np.min(arr) >= 0:
+                    setattr(self, name, arr.astype(np.min_scalar_type(np.max(arr)), copy=False))
+        if hasattr(self, 'pulse_width'):
+            self.pulse_width = self.pulse_width.astype(np.float32, copy=False)
+        return self
+
+    @property
+    def nbytes(self):
+        """
+        the memory used by the loaded columns
+        """
+        return sum(getattr(self, name).nbytes for name in self.column_names if hasattr(self, name))
 
     @Log.log_paras
     def glitch_gti_filter(self, **kwargs):
         arr_events = self.events
-        glitch_gti_arr = np.array([True] * len(arr_events))
+        glitch_gti_arr = np.ones(len(arr_events), dtype=np.bool_)
         if 'timedel' in kwargs:
             # filter glitch events by time intervals
             print(kwargs)
@@ -0,0 +1,154 @@
+from __future__ import absolute_import, division
+import os
+import re
+import json
+from astropy.io import fits
+
+__all__ = ['load_template',
+        'history_records',
+        'build_header',
+        'update_header']
+
+# keywords describing the structure of the data block, they are set by astropy
+# from the columns of the new table and must not be copied from the source header
+_STRUCTURE_KEY = re.compile(r"^(SIMPLE|EXTEND|XTENSION|BITPIX|NAXIS\d*|PCOUNT|GCOUNT|TFIELDS|THEAP|"
+        r"(%s)\d+)$"%("|".join(fits.column.KEYWORD_NAMES)))
+
+_REFDATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "refdata")
+
+def load_template(instrument, filetype="spectrum"):
+    """
+    Load the header template of refdata (e.g. HE_spectrum_header.json)
+
+    Parameters
+    --------------
+    instrument : string
+        The instrument, "HE" or "LE" (capital insensitive)
+
+    filetype : string (optional)
+        The type of template
+
+    Returns
+    -------------
+    fixed_key : dict
+        The keywords with fixed values
+
+    unfixed_key : dict
+        The keywords whose values should be given for each file
+    """
+    template_file = os.path.join(_REFDATA_DIR, "%s_%s_header.json"%(instrument.upper(), filetype.lower()))
+    with open(template_file) as f:
+        template = json.load(f, strict=False)
+    # strip the stray whitespaces around the keywords of templates
+    fixed_key = {key.strip(): value for key, value in template["fixed_key"].items()}
+    unfixed_key = {key.strip(): value for key, value in template["unfixed_key"].items()}
+    return fixed_key, unfixed_key
+
+def history_records(task, paras):
+    """
+    Convert the parameters recorded by Log.log_paras to HISTORY records
+
+    Parameters
+    --------------
+    task : string
+        The name of the task
+
+    paras : dict
+        The parameters of the task, e.g. returned by a function decorated
+        by Log.log_paras with history=True
+
+    Returns
+    -------------
+    records : list
+        The HISTORY records
+    """
+    return ["TASK : %s, %s = %s"%(task, key, paras[key]) for key in paras]
+
+def build_header(source=None, template=None, history=None, **header_kwargs):
+    """
+    Build the complete header of an extension before writing the file.
+
+    The keywords are merged in the order: template, source header,
+    header_kwargs; HISTORY records of the source header are kept and the new
+    records are appended. The keywords describing the data structure
+    (NAXISn, TFORMn, ...) are not copied, astropy sets them from the data.
+
+    Parameters
+    --------------
+    source : Header (optional)
+        The header to copy the keywords from
+
+    template : string or dict (optional)
+        The instrument of refdata template ("HE" or "LE"), or a dict of keywords.
+        Keywords with null values are skipped.
+
+    history : list (optional)
+        The HISTORY records to append
+
+    header_kwargs :
+        add keywords to the header, 'CREATOR = XXX' for example.
+
+    Returns
+    -------------
+    header : Header
+        The new header
+    """
+    header = fits.Header()
+    # Header.extend with update=True replaces the existing keywords but keeps
+    # all the HISTORY and COMMENT records; a single extend does not replace the
+    # duplicated keywords within its own cards, so each layer is merged in turn
+    if template is not None:
+        if not isinstance(template, dict):
+            fixed_key, unfixed_key = load_template(template)
+            template = dict(fixed_key, **unfixed_key)
+        header.extend([(key, value) for key, value in template.items() if value is not None], update=True)
+    if source is not None:
+        header.extend([card for card in source.cards if not _STRUCTURE_KEY.match(card.keyword)], update=True)
+    header.extend(list(header_kwargs.items()), update=True)
+    if history is not None:
+        for record in history:
+            header.add_history(record)
+    return header
+
+def update_header(filename, extension_num=1, history=None, allow_resize=False, **header_kwargs):
+    """
+    Update the header of a FITS file in place.
+
+    Only the header blocks are rewritten as long as the new header fits in
+    the free space (padding) of its 2880-byte blocks. If the header outgrows
+    its blocks, astropy has to rewrite the whole file including the data
+    blocks; this raises IOError unless allow_resize is True.
+
+    Parameters
+    --------------
+    filename : string
+        The name of FITS file
+
+    extension_num : int (optional)
+        The extension number for modification (start with 0).
+
+    history : list (optional)
+        The HISTORY records to append
+
+    allow_resize : bool (optional)
+        Allow the header to grow, which rewrites the whole file.
+
+    header_kwargs :
+        add keywords to the header of FITS file.
+    """
+    with fits.open(filename, mode="update", memmap=True) as hdulist:
+        header = hdulist[extension_num].header
+        new_header = header.copy()
+        new_header.update(header_kwargs)
+        if history is not None:
+            for record in history:
+                new_header.add_history(record)
+
+        # the size of header (with padding) in the file
+        if (len(new_header.tostring()) > len(header.tostring())) and (not allow_resize):
+            raise IOError("the new header of %s exceeds the free space of its header blocks, "
+                    "the whole file would be rewritten (use allow_resize=True to do so)"%(filename))
+        header.update(header_kwargs)
+        if history is not None:
+            for record in history:
+                header.add_history(record)
@@ -0,0 +1,275 @@
+from __future__ import absolute_import, division
+import numpy as np
+import numba
+from hxmtpy.Events import Events
+from hxmtpy.utils import _native, _time_bin, lightcurve, numba_lightcurve_cube, _band_lookup, _box_lookup
+
+__all__ = ['EventStore',
+        'GlitchFilterOnline',
+        'LightcurveAccumulator']
+
+def _grow(arr, size):
+    """
+    enlarge the first axis of array to at least size (doubling the capacity)
+    """
+    capacity = max(size, 2*arr.shape[0], 1024)
+    new_arr = np.zeros((capacity,) + arr.shape[1:], dtype=arr.dtype)
+    new_arr[:arr.shape[0]] = arr
+    return new_arr
+
+class EventStore():
+    """
+    Appendable store of events for near-real-time data.
+
+    The columns are kept in over-allocated buffers, so appending a packet
+    costs O(packet size) instead of re-merging all accumulated events.
+    """
+
+    __slots__ = ('_buffers', '_size')
+
+    def __init__(self):
+        self._buffers = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, arr_events, **columns):
+        """
+        append a packet of events
+
+        Parameters
+        ---------------
+        arr_events : array-like
+            The arrival time of events in the packet
+
+        columns : array-like (optional)
+            The other columns of events, e.g. channel=..., detid=..., pulse_width=...
+            The same columns must be given for every packet.
+        """
+        columns['events'] = arr_events
+        if self._size and set(columns) != set(self._buffers):
+            raise ValueError("columns %s do not match the stored columns %s"%(
+                sorted(columns), sorted(self._buffers)))
+        size = self._size + len(arr_events)
+        for name, column in columns.items():
+            column = _native(column)
+            if name not in self._buffers:
+                self._buffers[name] = np.zeros(0, dtype=column.dtype)
+            if size > len(self._buffers[name]):
+                self._buffers[name] = _grow(self._buffers[name], size)
+            self._buffers[name][self._size:size] = column
+        self._size = size
+
+    def column(self, name):
+        """
+        The stored column (view of the buffer)
+        """
+        return self._buffers[name][:self._size]
+
+    def to_events(self):
+        """
+        The stored events as Events object, the columns are views of the buffers
+        and are valid until the next append
+        """
+        columns = {name: self.column(name) for name in self._buffers if name != 'events'}
+        return Events(self.column('events'), **columns)
+
+@numba.njit(nogil=True)
+def numba_glitch_filter_update(time, detid, offset, gti, buf_index, buf_time, buf_len,
+        timedel, evtnum, box_lut):
+    """
+    update the glitch filter state with a packet of events, the events are
+    grouped in every evtnum events of each detector box as numba_glitch_filter
+    """
+    for i in range(len(time)):
+        box = box_lut[detid[i]] if detid[i] < len(box_lut) else 2
+        k = buf_len[box]
+        buf_index[box, k] = offset + i
+        buf_time[box, k] = time[i]
+        buf_len[box] = k + 1
+        if buf_len[box] == evtnum:
+            glitch = True
+            for j in range(1, evtnum):
+                if buf_time[box, j] - buf_time[box, j-1] > timedel:
+                    glitch = False
+                    break
+            if glitch:
+                for j in range(evtnum):
+                    gti[buf_index[box, j]] = False
+            buf_len[box] = 0
+
+class GlitchFilterOnline():
+    """
+    Incremental glitch filter which keeps the state of the filter across
+    appended packets of events.
+
+    The events are grouped in every evtnum events of each detector box
+    (detid <=5, 6-11, >11) as numba_glitch_filter; a group is flagged as
+    glitch if all the time differences are less than timedel. The events of
+    an incomplete group are kept as good events until the group is completed
+    by the following packets.
+    """
+
+    __slots__ = ('timedel', 'evtnum', '_gti', '_size', '_buf_index', '_buf_time', '_buf_len', '_box_lut')
+
+    def __init__(self, timedel, evtnum):
+        self.timedel = timedel
+        self.evtnum = evtnum
+        self._gti = np.ones(0, dtype=np.bool_)
+        self._size = 0
+        self._buf_index = np.zeros((3, evtnum), dtype=np.intp)
+        self._buf_time = np.zeros((3, evtnum), dtype=np.float64)
+        self._buf_len = np.zeros(3, dtype=np.intp)
+        self._box_lut = _box_lookup(255)
+
+    def update(self, arr_events, detid):
+        """
+        filter a packet of events
+
+        Returns
+        -------------
+        gti : bool-array
+            The filter bool of all events received (view of the internal buffer),
+            the bool of events before the settled index could still be
+            changed by the following packets.
+        """
+        offset = self._size
+        size = offset + len(arr_events)
+        if size > len(self._gti):
+            self._gti = _grow(self._gti, size)
+            self._gti[offset:] = True
+        numba_glitch_filter_update(_native(arr_events).astype(np.float64, copy=False), _native(detid),
+                offset, self._gti, self._buf_index, self._buf_time, self._buf_len,
+                self.timedel, self.evtnum, self._box_lut)
+        self._size = size
+        return self.gti
+
+    @property
+    def gti(self):
+        return self._gti[:self._size]
+
+    @property
+    def settled(self):
+        """
+        The number of leading events whose filter bool will not change anymore
+        """
+        pending = [self._buf_index[box, 0] for box in range(3) if self._buf_len[box] > 0]
+        return min(pending) if pending else self._size
+
+class LightcurveAccumulator():
+    """
+    Incremental light curve (cube) accumulator, only the bins covered by the
+    new packet are updated.
+
+    The bin edges are the same with lightcurve_cube starting from tstart
+    (np.arange(tstart, tstop, binsize)) and do not depend on how the events
+    are split in packets; events before tstart are ignored. Since the light
+    curve is open-ended, every bin is [left, right): an event exactly on the
+    right edge of the last bin opens a new bin, whereas lightcurve_cube puts
+    it in the last bin.
+    """
+
+    __slots__ = ('tstart', 'binsize', 'bands', '_counts', '_nbins', '_band_lut', '_box_lut')
+
+    def __init__(self, tstart, binsize=1, bands=None, split_box=False, channel_max=4095):
+        """
+        initial Parameters
+        ---------------------
+        tstart : float
+            The start time of the first bin
+
+        binsize : float (optional)
+            The bin size of light curves
+
+        bands : n*2 array-like (optional)
+            The [lowchan, highchan] of energy bands, all events are counted in one band if None
+
+        split_box : bool (optional)
+            Split the light curves by detector boxes (detid <=5, 6-11, >11)
+
+        channel_max : int (optional)
+            The maximum channel of the energy bands lookup table
+        """
+        self.tstart = tstart
+        self.binsize = binsize
+        if bands is None:
+            self.bands = None
+            self._band_lut = np.zeros(1, dtype=np.intp)
+            nband = 1
+        else:
+            self.bands, self._band_lut = _band_lookup(bands, channel_max)
+            nband = len(self.bands)
+        if split_box:
+            self._box_lut = _box_lookup(255)
+            nbox = 3
+        else:
+            self._box_lut = None
+            nbox = 1
+        self._counts = np.zeros((nbox, nband, 0), dtype=np.int64)
+        self._nbins = 0
+
+    def update(self, arr_events, channel=None, detid=None):
+        """
+        add a packet of events to the light curves
+
+        Returns
+        -------------
+        first_bin : int
+            The index of the first bin updated by the packet
+        """
+        time = _native(arr_events).astype(np.float64, copy=False)
+        if len(time) == 0:
+            return self._nbins
+        if self.bands is None:
+            channel = np.zeros(0, dtype=np.intp)
+        elif channel is None:
+            raise IOError("channel data does not loaded, channel is required to split the energy bands")
+        if self._box_lut is None:
+            detid = np.zeros(0, dtype=np.intp)
+            box_lut = np.zeros(1, dtype=np.intp)
+        elif detid is None:
+            raise IOError("detid data does not loaded, detid is required to split the detector boxes")
+        else:
+            box_lut = self._box_lut
+
+        nbins = max(self._nbins, _time_bin(np.max(time), self.tstart, self.binsize) + 1)
+        if nbins > self._counts.shape[2]:
+            counts = np.zeros(self._counts.shape[:2] + (max(nbins, 2*self._counts.shape[2], 1024),),
+                    dtype=np.int64)
+            counts[:, :, :self._nbins] = self._counts[:, :, :self._nbins]
+            self._counts = counts
+        self._nbins = nbins
+
+        # the events are always binned relative to tstart, the kernel only
+        # touches the bins of the events in the packet
+        numba_lightcurve_cube(self._counts[:, :, :nbins], time, _native(channel), _native(detid),
+                self.tstart, self.binsize, self._band_lut, box_lut, False)
+        return min(max(_time_bin(np.min(time), self.tstart, self.binsize), 0), nbins)
+
+    @property
+    def counts(self):
+        """
+        The (box, band, time) count cube
+        """
+        return self._counts[:, :, :self._nbins]
+
+    @property
+    def time(self):
+        """
+        The left edges of time bins
+        """
+        return self.tstart + np.arange(self._nbins)*((self.tstart + self.binsize) - self.tstart)
+
+    def to_lightcurve(self, band_num=0, box=None, rate=True):
+        """
+        Convert one energy band to lightcurve object, all boxes are summed if box is None.
+        The error of counts is the Poisson error.
+        """
+        counts = self.counts[:, band_num]
+        counts = counts.sum(axis=0) if box is None else counts[box]
+        yerr = np.sqrt(counts)
+        if rate:
+            counts = counts/self.binsize
+            yerr = yerr/self.binsize
+        return lightcurve(self.time, counts, yerr)
@@ -2,6 +2,7 @@ from __future__ import division
 import numpy as np
 from astropy.io import fits
 from hxmtpy.Events import Events
+from hxmtpy.pulsar.fold import profile_cube
 import numba
 
 __all__ = ['binary']
@@ -16,11 +17,7 @@ class binary(Events):
 
     """
 
-    def __init__(self, arr_events):
-        if arr_events.dtype == '>f8':
-            self.events = numba.float64(arr_events) # transfer big-endian dtype to non big-endian dtype
-        else:
-            self.events = arr_events
+    __slots__ = ()
 
     def orbit_cor_bt(self, Porb, axsini, e, omega, Tw, gamma):
         """
@@ -174,6 +171,30 @@ class binary(Events):
         f_intri = f_spin - f_dopp
         return f_intri
     
+    def fold(self, f0, f1=0, f2=0, t0=None, nphase=100, bands=None, split_box=False, split_det=False,
+            time=None):
+        """
+        fold the events to pulse profiles of energy bands and detector boxes,
+        see profile_cube
+
+        Parameters
+        --------------
+        time : array-like (optional)
+            The corrected time of events (e.g. returned by orbit_cor_bt or orbit_cor_deeter),
+            self.events is used if None
+
+        Returns
+        -------------
+        profiles : profile_cube
+            The (box, band, phase) cube of pulse profiles
+        """
+        if time is None:
+            time = self.events
+        channel = self.channel if bands is not None else None
+        detid = self.detid if (split_box or split_det) else None
+        return profile_cube(time, f0, f1, f2, t0=t0, nphase=nphase, channel=channel, bands=bands,
+                detid=detid, split_box=split_box, split_det=split_det)
+
     def _get_fdopp(self, f0, axsini, Porb, omega, e, T_halfpi):
         """
         calculate the frequency modulated by Doppler effect
@@ -0,0 +1,145 @@
+from __future__ import division
+import numpy as np
+import numba
+from hxmtpy.utils import _native, _band_lookup, _box_lookup
+
+__all__ = ['profile_cube',
+        'numba_phase_cube']
+
+
+@numba.njit(parallel=True, nogil=True)
+def numba_phase_cube(time, channel, detid, t0, f0, f1, f2, nphase, band_lut, box_lut, nbox, nband):
+    """
+    fold the events into the (box (or detector), band, phase) count cube in one scan,
+    each thread accumulates its own cube and the cubes are summed at the end.
+    An empty channel (detid) array puts all events in band 0 (box 0).
+    """
+    nthreads = numba.get_num_threads()
+    local_cube = np.zeros((nthreads, nbox, nband, nphase), dtype=np.int64)
+    n = len(time)
+    chunk = (n + nthreads - 1)//nthreads
+    for k in numba.prange(nthreads):
+        for i in range(k*chunk, min((k+1)*chunk, n)):
+            if len(channel) == 0:
+                band = 0
+            else:
+                band = band_lut[channel[i]] if channel[i] < len(band_lut) else -1
+            if band < 0:
+                continue
+            if len(detid) == 0:
+                box = 0
+            else:
+                box = box_lut[detid[i]] if detid[i] < len(box_lut) else nbox - 1
+            dt = time[i] - t0
+            phi = dt*(f0 + dt*(f1/2 + dt*f2/6))
+            phi -= np.floor(phi)
+            pbin = int(phi*nphase)
+            if pbin >= nphase:
+                pbin = nphase - 1
+            local_cube[k, box, band, pbin] += 1
+    return local_cube.sum(axis=0)
+
+class profile_cube():
+    """
+    A Class for pulse profiles of several energy bands (and detector boxes
+    or detectors) folded together
+    """
+
+    __slots__ = ('phase', 't0', 'bands', 'counts')
+
+    def __init__(self, time, f0, f1=0, f2=0, t0=None, nphase=100, channel=None, bands=None,
+            detid=None, split_box=False, split_det=False):
+        """
+        initial Parameters
+        ---------------------
+        time : array-like
+            The arrival time of events (e.g. corrected by binary.orbit_cor_bt)
+
+        f0, f1, f2 : float
+            The frequency, frequency derivative and second derivative at reference epoch t0,
+            the phase is f0*dt + f1*dt^2/2 + f2*dt^3/6 with dt = time - t0
+
+        t0 : float (optional)
+            The reference epoch, the start of time if None (same with fre_doppler_cor)
+
+        nphase : int (optional)
+            The number of phase bins
+
+        channel : array-like (optional)
+            The channel of events, required if bands is not None
+
+        bands : n*2 array-like (optional)
+            The [lowchan, highchan] of each energy band (both included), bands must not overlap.
+            All events are folded in one band if None. Single-channel bands,
+            e.g. [[c, c] for c in range(256)], give the full channel axis.
+
+        detid : array-like (optional)
+            The detector id of events, required if split_box or split_det is True
+
+        split_box : bool (optional)
+            Split the profiles by detector boxes (detid <=5, 6-11, >11)
+
+        split_det : bool (optional)
+            Split the profiles by each detector, the box axis of counts is then
+            indexed by detid (0 to the maximum detid)
+        """
+        time = np.asarray(time, dtype=np.float64)
+        if t0 is None:
+            t0 = np.min(time)
+        if bands is None:
+            band_lut = np.zeros(1, dtype=np.intp)
+            channel = np.zeros(0, dtype=np.intp)
+            nband = 1
+        else:
+            if channel is None:
+                raise IOError("channel data does not loaded, channel is required to split the energy bands")
+            channel = _native(channel)
+            bands, band_lut = _band_lookup(bands, int(np.max(channel)))
+            nband = len(bands)
+        if split_box and split_det:
+            raise ValueError("split_box and split_det can not be used together")
+        if split_box or split_det:
+            if detid is None:
+                raise IOError("detid data does not loaded, detid is required to split the detectors")
+            detid = _native(detid)
+            detid_max = int(np.max(detid))
+            if split_det:
+                box_lut = np.arange(detid_max+1, dtype=np.intp)
+                nbox = detid_max + 1
+            else:
+                box_lut = _box_lookup(detid_max)
+                nbox = 3
+        else:
+            detid = np.zeros(0, dtype=np.intp)
+            box_lut = np.zeros(1, dtype=np.intp)
+            nbox = 1
+
+        self.t0 = t0
+        self.bands = bands
+        self.phase = np.arange(nphase)/nphase
+        self.counts = numba_phase_cube(time, channel, detid, float(t0), float(f0), float(f1), float(f2),
+                nphase, band_lut, box_lut, nbox, nband)
+
+    def profile(self, band_num=0, box=None):
+        """
+        The pulse profile of one energy band, all boxes (detectors) are summed if box is None
+        """
+        if box is None:
+            return self.box_sum[band_num]
+        return self.counts[box, band_num]
+
+    @property
+    def band_sum(self):
+        """
+        The profiles summed over all energy bands, with shape (box, phase)
+        """
+        return self.counts.sum(axis=1)
+
+    @property
+    def box_sum(self):
+        """
+        The profiles summed over all detector boxes (detectors), with shape (band, phase)
+        """
+        if self.counts.shape[0] == 1:
+            return self.counts[0]
+        return self.counts.sum(axis=0)
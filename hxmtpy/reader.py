@@ -0,0 +1,144 @@
+from __future__ import absolute_import, division
+import threading
+import numpy as np
+from astropy.io import fits
+from hxmtpy.utils import _native
+
+try:
+    import queue
+except ImportError: # python 2
+    import Queue as queue
+
+__all__ = ['PrefetchReader']
+
+class _ReaderError():
+    """
+    wrap the exception raised in the reader thread
+    """
+    def __init__(self, error):
+        self.error = error
+
+_END = object()
+
+class PrefetchReader():
+    """
+    Read the extension of FITS files in a background thread.
+
+    The reader thread prefetches the next files (or the next row chunks of
+    the extension) while the current one is processed, at most max_prefetch
+    chunks are buffered and the reader waits when the buffer is full.
+    The reader can only be iterated once.
+
+    Examples
+    -------------
+    >>> glitch_filter = GlitchFilterOnline(4e-4, 3)
+    >>> with PrefetchReader(files, columns=['Time', 'Det_ID'], chunk_rows=1000000) as reader:
+    ...     for filename, start_row, data in reader:
+    ...         gti = glitch_filter.update(data['Time'], data['Det_ID'])
+    """
+
+    def __init__(self, files, extension_num=1, columns=None, chunk_rows=None, max_prefetch=2):
+        """
+        initial Parameters
+        ---------------------
+        files : list
+            The names of FITS files
+
+        extension_num : int (optional)
+            The extension number to read (start with 0).
+
+        columns : list (optional)
+            The names of columns to read, all columns are read if None
+
+        chunk_rows : int (optional)
+            The number of rows in each chunk, the whole extension is one chunk if None
+
+        max_prefetch : int (optional)
+            The maximum number of chunks buffered by the reader
+        """
+        if isinstance(files, str):
+            files = [files]
+        self.files = list(files)
+        self.extension_num = extension_num
+        self.columns = columns
+        self.chunk_rows = chunk_rows
+        self._queue = queue.Queue(maxsize=max(max_prefetch, 1))
+        self._stop = threading.Event()
+        self._thread = None
+        self._finished = False
+
+    def _put(self, item):
+        # block until there is room in the buffer or the reader is closed
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read(self):
+        try:
+            for filename in self.files:
+                with fits.open(filename, memmap=True) as hdulist:
+                    data = hdulist[self.extension_num].data
+                    columns = data.names if self.columns is None else self.columns
+                    nrows = len(data)
+                    chunk_rows = nrows if self.chunk_rows is None else self.chunk_rows
+                    for start in range(0, max(nrows, 1), max(chunk_rows, 1)):
+                        # slice the rows first, so that scaled columns (TZERO/TSCAL) are only
+                        # converted for this chunk; np.array touches the memmap, the disk read happens here
+                        rows = data[start:start+chunk_rows]
+                        chunk = {name: _native(np.array(rows.field(name))) for name in columns}
+                        del rows
+                        if not self._put((filename, start, chunk)):
+                            return
+                    del data
+        except Exception as error:
+            self._put(_ReaderError(error))
+            return
+        self._put(_END)
+
+    def start(self):
+        if self._finished or self._stop.is_set():
+            raise RuntimeError("PrefetchReader can only be iterated once, create a new reader to read again")
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._read)
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def __iter__(self):
+        self.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _END:
+                    self._finished = True
+                    return
+                if isinstance(item, _ReaderError):
+                    self._finished = True
+                    raise item.error
+                yield item
+        finally:
+            # stop the reader thread if the loop ends early
+            self.close()
+
+    def close(self):
+        """
+        stop the reader thread and release the buffered chunks
+        """
+        self._stop.set()
+        if self._thread is not None:
+            while self._thread.is_alive():
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    self._thread.join(0.1)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from hxmtpy.Events import Events
+
+
+def _events(n=100):
+    time = np.arange(n, dtype='>f8')
+    channel = np.arange(n) % 256
+    detid = np.arange(n) % 18
+    pulse_width = np.linspace(50, 80, n)
+    return Events(time, channel=channel, detid=detid, pulse_width=pulse_width)
+
+def test_native_byteorder():
+    evt = _events()
+    assert evt.events.dtype == np.float64
+    assert evt.events.dtype.byteorder in ('=', '|')
+
+def test_slice_is_view():
+    evt = _events()
+    sliced = evt.time_slice(10, 20)
+    assert len(sliced) == 10
+    assert np.shares_memory(sliced.events, evt.events)
+    assert np.shares_memory(sliced.channel, evt.channel)
+    assert np.array_equal(sliced.events, np.arange(10, 20))
+
+def test_deferred_gather():
+    evt = _events()
+    mask = evt.channel > 50
+    filtered = evt[mask]
+    assert len(filtered) == np.count_nonzero(mask)
+    # the columns are gathered only when they are read
+    assert 'detid' in filtered._pending
+    assert np.array_equal(filtered.detid, evt.detid[mask])
+    assert 'detid' not in filtered._pending
+    # filtering a filtered Events composes the indices
+    assert np.array_equal(filtered[[0, -1]].events, evt.events[mask][[0, -1]])
+    assert np.array_equal(filtered[2:4].pulse_width, evt.pulse_width[mask][2:4])
+
+def test_scalar_and_empty_keys():
+    evt = _events()
+    assert len(evt[3]) == 1
+    assert evt[-1].events[0] == 99
+    assert len(evt[[]]) == 0
+    assert len(evt[[]].channel) == 0
+
+def test_invalid_keys():
+    evt = _events()
+    for key in ([100], [-101], [1.5], np.ones(10, dtype=bool), True):
+        with pytest.raises(IndexError):
+            evt[key]
+
+def test_narrow_dtypes():
+    evt = _events()
+    evt.narrow_dtypes()
+    assert evt.channel.dtype == np.uint8
+    assert evt.detid.dtype == np.uint8
+    assert evt.pulse_width.dtype == np.float32
+    assert evt.events.dtype == np.float64
+    # float channels are not narrowed
+    evt = Events(np.arange(2.), channel=np.array([0., 3000.5]), narrow=True)
+    assert evt.channel.dtype == np.float64
+    assert evt.channel[1] == 3000.5
@@ -0,0 +1,51 @@
+import numpy as np
+from hxmtpy.pulsar.fold import profile_cube
+from hxmtpy.pulsar.binary import binary
+
+
+def _events(n=100000, seed=0):
+    rng = np.random.default_rng(seed)
+    time = np.sort(rng.uniform(0, 1000, n))
+    channel = rng.integers(0, 256, n)
+    detid = rng.integers(0, 18, n)
+    return time, channel, detid
+
+def _phase(time, f0, f1, f2, t0):
+    dt = time - t0
+    phase = dt*(f0 + dt*(f1/2 + dt*f2/6))
+    return phase - np.floor(phase)
+
+def test_single_profile():
+    time, channel, detid = _events()
+    f0, f1, f2 = 0.73, 1e-7, 1e-12
+    cube = profile_cube(time, f0, f1, f2, nphase=32)
+    counts, _ = np.histogram(_phase(time, f0, f1, f2, time.min()), bins=32, range=(0, 1))
+    assert cube.counts.shape == (1, 1, 32)
+    assert np.array_equal(cube.profile(), counts)
+
+def test_bands_and_detectors():
+    time, channel, detid = _events()
+    f0, t0 = 0.31, 100.
+    bands = [[0, 99], [100, 255]]
+    phase = _phase(time, f0, 0, 0, t0)
+    cube = profile_cube(time, f0, t0=t0, nphase=16, channel=channel.astype('>i2'), bands=bands,
+            detid=detid.astype('>i2'), split_det=True)
+    assert cube.counts.shape == (18, 2, 16)
+    for det in (0, 7, 17):
+        for i, (lowchan, highchan) in enumerate(bands):
+            mask = (detid == det) & (channel >= lowchan) & (channel <= highchan)
+            counts, _ = np.histogram(phase[mask], bins=16, range=(0, 1))
+            assert np.array_equal(cube.counts[det, i], counts)
+    boxes = profile_cube(time, f0, t0=t0, nphase=16, channel=channel, bands=bands,
+            detid=detid, split_box=True)
+    assert np.array_equal(boxes.counts[1], cube.counts[6:12].sum(axis=0))
+    assert np.array_equal(boxes.box_sum, cube.box_sum)
+
+def test_binary_fold():
+    time, channel, detid = _events()
+    evt = binary(time, channel=channel, detid=detid)
+    cube = evt.fold(0.5, nphase=8, bands=[[c, c] for c in range(256)], split_det=True)
+    counts, _ = np.histogram(_phase(time, 0.5, 0, 0, time.min())[(detid == 3) & (channel == 42)],
+            bins=8, range=(0, 1))
+    assert cube.counts.shape == (18, 256, 8)
+    assert np.array_equal(cube.counts[3, 42], counts)
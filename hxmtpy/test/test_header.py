@@ -0,0 +1,84 @@
+import os
+import numpy as np
+import pytest
+from astropy.io import fits
+from hxmtpy.header import build_header, update_header, load_template, history_records
+from hxmtpy.utils import FileUtils
+
+
+def _write_file(tmp_path, name="in.fits"):
+    columns = [fits.Column(name='Time', array=np.arange(4, dtype=np.float64), format='D', unit='s'),
+            fits.Column(name='PI', array=np.array([0, 40000, 65535, 1], dtype=np.uint16), format='I',
+                bzero=32768)]
+    header = fits.Header()
+    header['TELESCOP'] = 'HXMT'
+    header.add_history('old record')
+    filename = str(tmp_path / name)
+    fits.HDUList([fits.PrimaryHDU(), fits.BinTableHDU.from_columns(columns, header=header)]).writeto(filename)
+    return filename
+
+def test_load_template():
+    fixed_key, unfixed_key = load_template("le")
+    assert fixed_key['MJDREFI'] == 55927
+    assert 'TSTART' in unfixed_key
+
+def test_build_header():
+    source = fits.Header([('TELESCOP', 'HXMT'), ('NAXIS2', 10), ('TTYPE1', 'Time'), ('TZERO1', 32768)])
+    source.add_history('old record')
+    header = build_header(source, template="HE", history=history_records("filter", {'evtnum': 3}),
+            CREATOR='hxmtpy', INSTRUME='HE-CsI')
+    assert header['DETCHANS'] == 256
+    assert header['CREATOR'] == 'hxmtpy'
+    assert header['INSTRUME'] == 'HE-CsI'
+    assert 'EXPOSURE' not in header
+    for keyword in ('NAXIS2', 'TTYPE1', 'TZERO1'):
+        assert keyword not in header
+    assert list(header['HISTORY']) == ['old record', 'TASK : filter, evtnum = 3']
+
+def test_filter_keeps_scaled_columns(tmp_path):
+    infile = _write_file(tmp_path)
+    outfile = str(tmp_path / "out.fits")
+    FileUtils(infile).filter(np.array([True, True, True, False]), outfile,
+            log_paras={'timedel': 1e-4}, CREATOR='hxmtpy')
+    with fits.open(outfile) as hdulist:
+        assert np.array_equal(hdulist[1].data['PI'], [0, 40000, 65535])
+        assert hdulist[1].header['CREATOR'] == 'hxmtpy'
+        assert hdulist[1].header['TUNIT1'] == 's'
+        assert list(hdulist[1].header['HISTORY']) == ['old record', 'TASK : filter, timedel = 0.0001']
+
+def test_add_column_and_merge(tmp_path):
+    infile = _write_file(tmp_path)
+    outfile = str(tmp_path / "add.fits")
+    FileUtils(infile).add_column(np.ones(4), 'PW', column_unit='ns', column_format='E', outfile=outfile,
+            OBSERVER='me')
+    header = fits.getheader(outfile, 1)
+    assert header['OBSERVER'] == 'me'
+    assert header['TUNIT3'] == 'ns'
+    assert header['HISTORY'][-1] == 'TASK : add_column, add column PW to extention 1'
+
+    FileUtils(outfile).add_column(np.zeros(4), 'PW', outfile=outfile, OBSERVER='you')
+    header = fits.getheader(outfile, 1)
+    assert header['OBSERVER'] == 'you'
+    assert np.array_equal(fits.getdata(outfile, 1)['PW'], np.zeros(4))
+
+    mergefile = str(tmp_path / "merge.fits")
+    FileUtils(infile).merge_extension(infile, outfile=mergefile)
+    assert np.array_equal(fits.getdata(mergefile, 1)['PI'], [0, 40000, 65535, 1]*2)
+    # the long HISTORY record is wrapped over several cards
+    assert "".join(fits.getheader(mergefile, 1)['HISTORY']).endswith("from file %s and %s"%(infile, infile))
+
+def test_update_header(tmp_path):
+    infile = _write_file(tmp_path)
+    size = os.path.getsize(infile)
+    update_header(infile, TSTART=1.0, history=['new record'])
+    header = fits.getheader(infile, 1)
+    assert header['TSTART'] == 1.0
+    assert header['HISTORY'][-1] == 'new record'
+    assert os.path.getsize(infile) == size
+
+    with pytest.raises(IOError):
+        update_header(infile, history=['record %d'%(i) for i in range(60)])
+    assert len(fits.getheader(infile, 1)['HISTORY']) == 2
+    update_header(infile, history=['record %d'%(i) for i in range(60)], allow_resize=True)
+    assert len(fits.getheader(infile, 1)['HISTORY']) == 62
+    assert np.array_equal(fits.getdata(infile, 1)['PI'], [0, 40000, 65535, 1])
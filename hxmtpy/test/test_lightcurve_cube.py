@@ -0,0 +1,52 @@
+import numpy as np
+from hxmtpy.utils import lightcurve_cube, lightcurve_hist
+
+
+def _events(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    time = np.sort(np.r_[rng.uniform(3.7, 100, n), 3.7 + np.arange(100)*0.05]) # events on the bin edges
+    channel = rng.integers(0, 256, len(time))
+    detid = rng.integers(0, 18, len(time))
+    return time, channel, detid
+
+def test_bands_match_lightcurve_hist():
+    time, channel, detid = _events()
+    bands = [[0, 99], [100, 255]]
+    for binsize in (1, 0.1):
+        cube = lightcurve_cube(time, channel, bands, binsize=binsize)
+        x, y = lightcurve_hist(time, binsize=binsize, rate=False)
+        assert np.array_equal(cube.time, x)
+        assert np.array_equal(cube.band_sum[0], y)
+        for i, (lowchan, highchan) in enumerate(bands):
+            mask = (channel >= lowchan) & (channel <= highchan)
+            counts, _ = np.histogram(time[mask], bins=np.append(x, x[-1] + (x[1]-x[0])))
+            assert np.array_equal(cube.band(i, 0), counts)
+
+def test_split_box():
+    time, channel, detid = _events()
+    bands = [[0, 99], [100, 255]]
+    cube = lightcurve_cube(time, channel, bands, binsize=1, detid=detid, split_box=True)
+    single = lightcurve_cube(time, channel, bands, binsize=1)
+    assert cube.counts.shape == (3, 2, len(cube.time))
+    assert np.array_equal(cube.box_sum, single.counts[0])
+    edges = np.append(cube.time, cube.time[-1] + 1)
+    counts, _ = np.histogram(time[(detid > 5) & (detid <= 11) & (channel >= 100)], bins=edges)
+    assert np.array_equal(cube.band(1, 1), counts)
+
+def test_big_endian_columns():
+    time, channel, detid = _events()
+    cube = lightcurve_cube(time.astype('>f8'), channel.astype('>i2'), [[26, 60]],
+            detid=detid.astype('>i2'), split_box=True)
+    assert cube.counts.sum() == np.count_nonzero((channel >= 26) & (channel <= 60))
+
+def test_hardness_ratio_and_lightcurve():
+    time, channel, detid = _events()
+    cube = lightcurve_cube(time, channel, [[0, 99], [100, 255]], binsize=1)
+    soft, hard = cube.box_sum
+    ratio = cube.hardness_ratio(1, 0)
+    assert np.allclose(ratio[soft > 0], hard[soft > 0]/soft[soft > 0])
+    lc = cube.to_lightcurve(1, rate=False)
+    assert np.array_equal(lc.counts, hard)
+    assert np.allclose(lc.yerr, np.sqrt(hard))
+    new_x, new_y, new_yerr = lc.rebin(bins=np.array([0, 10, 2]))
+    assert len(new_x) == 5
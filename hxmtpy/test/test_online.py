@@ -0,0 +1,81 @@
+import numpy as np
+from hxmtpy.online import EventStore, GlitchFilterOnline, LightcurveAccumulator
+from hxmtpy.utils import lightcurve_cube
+
+
+def _events(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    time = rng.uniform(0, 100, n)
+    time[:50] = np.arange(50, dtype=np.float64) # events exactly on the bin edges
+    time[100:140] = 60 + np.arange(40)*1e-7 # glitch in one detector box
+    order = np.argsort(time, kind='stable')
+    channel = rng.integers(0, 256, n).astype(np.uint8)
+    detid = rng.integers(0, 18, n).astype(np.uint8)
+    detid[100:140] = 3
+    return time[order], channel[order], detid[order]
+
+def _packets(n, size=777):
+    return [slice(start, start+size) for start in range(0, n, size)]
+
+def test_glitch_filter_packets():
+    time, channel, detid = _events()
+    single = GlitchFilterOnline(1e-4, 5)
+    single.update(time, detid)
+    online = GlitchFilterOnline(1e-4, 5)
+    for packet in _packets(len(time)):
+        online.update(time[packet], detid[packet])
+    assert np.array_equal(online.gti, single.gti)
+    # the 40 glitch events fill at least 7 complete groups of 5 events
+    assert np.count_nonzero(~online.gti) >= 35
+    assert online.settled == single.settled
+
+def test_lightcurve_accumulator_packets():
+    time, channel, detid = _events()
+    bands = [[0, 99], [100, 255]]
+    cube = lightcurve_cube(time, channel, bands, binsize=1, detid=detid, split_box=True)
+    acc = LightcurveAccumulator(time[0], binsize=1, bands=bands, split_box=True)
+    for packet in _packets(len(time)):
+        acc.update(time[packet], channel[packet], detid[packet])
+    nbins = cube.counts.shape[2]
+    assert np.array_equal(acc.counts[:, :, :nbins], cube.counts)
+    assert acc.counts[:, :, nbins:].sum() == 0
+
+def test_event_store_packets():
+    time, channel, detid = _events()
+    store = EventStore()
+    for packet in _packets(len(time)):
+        store.append(time[packet], channel=channel[packet], detid=detid[packet])
+    events = store.to_events()
+    assert np.array_equal(events.events, time)
+    assert np.array_equal(events.channel, channel)
+    assert np.array_equal(events.detid, detid)
+
+def test_lightcurve_accumulator_inexact_binsize():
+    # binsize 0.1 is not exact in binary, events every 0.05 s are on the bin edges
+    time = 3.7 + np.arange(400)*0.05
+    channel = np.arange(400) % 256
+    bands = [[0, 99], [100, 255]]
+    results = []
+    for size in (len(time), 7, 1):
+        acc = LightcurveAccumulator(time[0], binsize=0.1, bands=bands)
+        for packet in _packets(len(time), size):
+            acc.update(time[packet], channel[packet])
+        assert acc.counts.shape[2] == len(acc.time)
+        assert acc.counts.sum() == len(time)
+        results.append(acc.counts)
+    assert np.array_equal(results[0], results[1])
+    assert np.array_equal(results[0], results[2])
+    # same bins with lightcurve_cube
+    cube = lightcurve_cube(time, channel, bands, binsize=0.1)
+    nbins = acc.counts.shape[2]
+    assert np.array_equal(results[0], cube.counts[:, :, :nbins])
+    assert cube.counts[:, :, nbins:].sum() == 0
+
+def test_lightcurve_accumulator_last_edge():
+    time = np.array([0, 0.5, 1, 2, 3])
+    acc = LightcurveAccumulator(0, binsize=1)
+    acc.update(time)
+    cube = lightcurve_cube(time, np.zeros(len(time), dtype=np.intp), [[0, 0]], binsize=1)
+    assert np.array_equal(cube.counts[0, 0], [2, 1, 2])
+    assert np.array_equal(acc.counts[0, 0], [2, 1, 1, 1])
+    assert np.array_equal(acc.time, [0, 1, 2, 3])
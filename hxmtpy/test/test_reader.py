@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from astropy.io import fits
+from hxmtpy.reader import PrefetchReader
+
+
+def _write_files(tmp_path, nfiles=3, nrows=10):
+    files = []
+    for k in range(nfiles):
+        columns = [fits.Column(name='Time', array=np.arange(nrows, dtype=np.float64) + k*nrows, format='D'),
+                fits.Column(name='PI', array=np.arange(nrows, dtype=np.uint16) + 40000, format='I', bzero=32768)]
+        filename = str(tmp_path / ("evt%d.fits"%(k)))
+        fits.HDUList([fits.PrimaryHDU(), fits.BinTableHDU.from_columns(columns)]).writeto(filename)
+        files.append(filename)
+    return files
+
+def test_chunk_order(tmp_path):
+    files = _write_files(tmp_path)
+    chunks = list(PrefetchReader(files, chunk_rows=4, max_prefetch=1))
+    assert [(filename, start) for filename, start, data in chunks] == [
+            (filename, start) for filename in files for start in (0, 4, 8)]
+    time = np.concatenate([data['Time'] for filename, start, data in chunks])
+    assert np.array_equal(time, np.arange(30))
+    # scaled columns are read correctly in native byte order
+    pi = chunks[0][2]['PI']
+    assert np.array_equal(pi, [40000, 40001, 40002, 40003])
+    assert pi.dtype.byteorder in ('=', '|')
+
+def test_error_propagation(tmp_path):
+    files = _write_files(tmp_path, nfiles=1) + [str(tmp_path / "missing.fits")]
+    reader = PrefetchReader(files)
+    with pytest.raises(IOError):
+        for item in reader:
+            pass
+    assert reader._thread is None
+
+def test_early_close(tmp_path):
+    files = _write_files(tmp_path, nrows=100)
+    reader = PrefetchReader(files, chunk_rows=1, max_prefetch=1)
+    thread = reader.start()._thread
+    for item in reader:
+        break
+    thread.join(5)
+    assert not thread.is_alive()
+
+def test_single_use(tmp_path):
+    files = _write_files(tmp_path, nfiles=1)
+    with PrefetchReader(files) as reader:
+        assert len(list(reader)) == 1
+        with pytest.raises(RuntimeError):
+            list(reader)
@@ -3,12 +3,15 @@ import numpy as np
 import numba
 from astropy.io import fits
 from astropy.table import Table, Column
+from hxmtpy.header import build_header, history_records
 
 __all__ = ['FileUtils',
         'numba_glitch_filter',
         'numba_histogram',
         'lightcurve_hist',
-        'lightcurve']
+        'lightcurve',
+        'lightcurve_cube',
+        'numba_lightcurve_cube']
 
 class FileUtils():
     """
@@ -19,7 +22,7 @@ class FileUtils():
     def __init__(self, infile):
         self.infile = infile
 
-    def filter(self, filter_bool, outfile, extension_num=1, **header_kwargs):
+    def filter(self, filter_bool, outfile, extension_num=1, log_paras=None, **header_kwargs):
         """
         Filter the fits file by the bool array
 
@@ -35,6 +38,10 @@ class FileUtils():
         extension_num : int (optional)
             The extension number for modification (start with 0).
 
+        log_paras : dict (optional)
+            The parameters of the filter recorded by Log.log_paras,
+            written to the HISTORY records.
+
         header_kwargs : 
             add keywords to the header of FITS file.
             'CREATOR = XXX' for example.
@@ -52,38 +59,18 @@ class FileUtils():
 
 
         # filter the specific extension table
-        new_table = []
         table = hdulist[extension_num].data
-        column_names = table.names
-        column_type = table.formats
-        for column_name in column_names:
-            new_table.append( table.field(column_name)[filter_bool] )
 
-        ## construct the new table 
-        new_column = [fits.Column(name=column_names[i], array=new_table[i], format=column_type[i]) for i in
-                range(len(column_names))]
-        tb = fits.BinTableHDU.from_columns(new_column)
+        ## construct the new table and its complete header,
+        ## the filtered table keeps the column definitions (TZERO, TSCAL, TNULL ...)
+        history = None if log_paras is None else history_records("filter", log_paras)
+        header = build_header(hdulist[extension_num].header, history=history, **header_kwargs)
+        tb = fits.BinTableHDU(data=table[filter_bool], header=header)
 
         ## write to outfile
-        ### save 
         hdul = fits.HDUList([prim_hdr_new, tb] + rest_of_ext)
         hdul.writeto(outfile, overwrite=True)
 
-        ## copy the header of rest of extension
-        hdulist_cp = fits.open(outfile)
-        #print(hdulist_cp[extension_num].header)
-        for header_key in hdulist[extension_num].header:
-            if header_key in hdulist_cp[extension_num].header:
-                continue
-            elif (header_key == "HISTORY") or (header_key == "COMMENT"):
-                continue
-            else:
-                hdulist_cp[extension_num].header[header_key] = hdulist[extension_num].header[header_key]
-        ## write header_kwargs
-        for header_key in header_kwargs:
-            hdulist_cp[extension_num].header[header_key] = header_kwargs[header_key]
-        hdulist_cp.writeto(outfile, overwrite=True)
-
 
     def add_column(self, column_array, column_name, column_unit=None, column_format=None, 
             outfile=None, extension_num=1, **header_kwargs):
@@ -99,32 +86,21 @@ class FileUtils():
 
         for i, hdu in enumerate(hdulist):
             if i == extension_num:
-                hdu_new = hdu
                 ## copy old tables and add new column
                 col_names = hdu.data.names
-                col_type = hdu.data.formats
+                history = ["TASK : add_column, add column %s to extention %s"%(column_name, 
+                        str(extension_num))]
+                header = build_header(hdu.header, history=history, **header_kwargs)
 
                 if column_name in col_names:
                     WarningInfo.column_exist(column_name)
                     hdu.data[column_name] = column_array
+                    hdu_new = fits.BinTableHDU(data=hdu.data, header=header)
 
                 else: #column_name not exist, create new column
-                    new_columns = []
-                    table = hdu.data
-                    for j in range(len(col_names)):
-                        new_columns.append( fits.Column(name=col_names[j], 
-                                array=table.field(col_names[j]), 
-                                format=col_type[j]))
-                    new_column = fits.Column(name=column_name, array=column_array, format=column_format)
-                    new_columns.append(new_column)
-                    new_table = fits.BinTableHDU.from_columns(new_columns)
-                    hdu_new = fits.HDUList([new_table])[0]
-                    for keyword in hdu.header:
-                        if keyword not in hdu_new.header:
-                            hdu_new.header.set(keyword, hdu.header[keyword])
-
-                hdu_new.header["HISTORY"] = "TASK : add_column, add column %s to extention %s"%(column_name, 
-                        str(extension_num))
+                    new_column = fits.Column(name=column_name, array=column_array, format=column_format,
+                            unit=column_unit)
+                    hdu_new = fits.BinTableHDU.from_columns(hdu.columns + new_column, header=header)
 
         ## replace new extension
         hdulist_new = hdulist
@@ -164,18 +140,16 @@ class FileUtils():
                 for j in range(len(col_names)):
                     if col_names[j].lower() not in [x.lower() for x in col_names_mergefile]:
                         raise FormatError("Could not find column %s in %s"%(col_names[j], merge_filename))
+                    col = hdu.columns[j]
                     new_columns.append( fits.Column(name=col_names[j],
                         array=np.append(table.field(col_names[j]), 
                             hdulist_mergefile[extension_num].data.field(col_names[j])),
-                        format=col_type[j]))
-                new_table = fits.BinTableHDU.from_columns(new_columns)
-                hdu_new = fits.HDUList([new_table])[0]
-                for keyword in hdu.header:
-                    hdu_new.header.set(keyword, hdu.header[keyword])
-                    #TODO: properly modify the header info
-
-                hdu_new.header["HISTORY"] = "TASK : merge_extension, merge extension %s from file %s and %s"%(
-                        str(extension_num), self.infile, outfile)
+                        format=col_type[j], unit=col.unit, null=col.null, bscale=col.bscale,
+                        bzero=col.bzero, disp=col.disp, dim=col.dim))
+                history = ["TASK : merge_extension, merge extension %s from file %s and %s"%(
+                        str(extension_num), self.infile, merge_filename)]
+                hdu_new = fits.BinTableHDU.from_columns(new_columns,
+                        header=build_header(hdu.header, history=history))
         
         hdulist_new = hdulist
         hdulist_new[extension_num] = hdu_new
@@ -348,6 +322,8 @@ class lightcurve():
     A Class for X-ray Light Curve
     """
 
+    __slots__ = ('time', 'counts', 'yerr')
+
     def __init__(self, time, counts, yerr=None):
         """
         initial Parameters
@@ -366,6 +342,24 @@ class lightcurve():
         self.counts = counts
         self.yerr = yerr
 
+    def __len__(self):
+        return len(self.time)
+
+    def __getitem__(self, key):
+        """
+        slice the light curve, slicing returns views of the parent arrays
+        """
+        yerr = self.yerr
+        if yerr is not None and len(yerr) != 0:
+            yerr = yerr[key]
+        return type(self)(self.time[key], self.counts[key], yerr)
+
+    def time_slice(self, tstart, tstop):
+        """
+        select the bins with tstart <= time < tstop (views of the parent arrays)
+        """
+        return self[np.searchsorted(self.time, tstart, side='left'):np.searchsorted(self.time, tstop, side='left')]
+
     def _rebin_onebin(self, bins):
 
         x = self.time
@@ -452,6 +446,214 @@ class lightcurve():
             return new_x, new_y
 
 
+def _native(arr):
+    """
+    transfer big-endian dtype (FITS data) to non big-endian dtype
+    """
+    arr = np.asarray(arr)
+    if arr.dtype.byteorder not in ('=', '|'):
+        arr = arr.astype(arr.dtype.newbyteorder('='))
+    return arr
+
+def _band_lookup(bands, channel_max):
+    """
+    build the channel -> band index lookup table, channels outside
+    all bands are flagged by -1
+    """
+    bands = np.atleast_2d(np.asarray(bands, dtype=np.intp))
+    band_lut = np.full(channel_max+1, -1, dtype=np.intp)
+    for i, (lowchan, highchan) in enumerate(bands):
+        lowchan = max(lowchan, 0)
+        highchan = min(highchan, channel_max)
+        if np.any(band_lut[lowchan:highchan+1] != -1):
+            raise ValueError("energy bands overlap at channels %s-%s"%(lowchan, highchan))
+        band_lut[lowchan:highchan+1] = i
+    return bands, band_lut
+
+def _box_lookup(detid_max):
+    """
+    build the detid -> detector box lookup table, the boxes are the same
+    as the detid groups of numba_glitch_filter (detid <=5, 6-11, >11)
+    """
+    box_lut = np.zeros(detid_max+1, dtype=np.intp)
+    box_lut[6:12] = 1
+    box_lut[12:] = 2
+    return box_lut
+
+@numba.njit(nogil=True)
+def _time_bin(t, tstart, binsize):
+    """
+    the index of the time bin of t, the bin edges are the same with
+    np.arange(tstart, tstop, binsize), i.e. tstart + i*((tstart+binsize)-tstart).
+    The rounding of the division is corrected against the bin edges.
+    """
+    delta = (tstart + binsize) - tstart
+    tbin = int(np.floor((t - tstart)/delta))
+    while t < tstart + tbin*delta:
+        tbin -= 1
+    while t >= tstart + (tbin+1)*delta:
+        tbin += 1
+    return tbin
+
+@numba.njit(nogil=True)
+def numba_lightcurve_cube(cube, time, channel, detid, tstart, binsize, band_lut, box_lut, closed=True):
+    """
+    accumulate the events into the (box, band, time) count cube in one scan,
+    the cube is modified in place.
+
+    The time bins are the same with lightcurve_hist; the right edge of the
+    last bin is included if closed is True. An empty channel (detid) array
+    puts all events in band 0 (box 0).
+    """
+    nbins = cube.shape[2]
+    nbox = cube.shape[0]
+    for i in range(len(time)):
+        if len(channel) == 0:
+            band = 0
+        else:
+            band = band_lut[channel[i]] if channel[i] < len(band_lut) else -1
+        if band < 0:
+            continue
+        tbin = _time_bin(time[i], tstart, binsize)
+        if tbin < 0:
+            continue
+        if tbin >= nbins:
+            # time == tstop is in the last bin
+            if closed and tbin == nbins and time[i] == tstart + nbins*((tstart + binsize) - tstart):
+                tbin = nbins - 1
+            else:
+                continue
+        if len(detid) == 0:
+            box = 0
+        else:
+            box = box_lut[detid[i]] if detid[i] < len(box_lut) else nbox - 1
+        cube[box, band, tbin] += 1
+    return cube
+
+class lightcurve_cube():
+    """
+    A Class for energy resolved X-ray light curves of several energy bands
+    (and detector boxes) binned together
+    """
+
+    __slots__ = ('time', 'binsize', 'bands', 'counts')
+
+    def __init__(self, time, channel, bands, binsize=1, detid=None, split_box=False):
+        """
+        initial Parameters
+        ---------------------
+        time : array-like
+            The arrival time of events
+
+        channel : array-like
+            The channel of events
+
+        bands : n*2 array-like
+            The [lowchan, highchan] of each energy band (both included),
+            e.g. bands = np.array([[26,60], [61,120]]). Bands must not overlap.
+
+        binsize : float (optional)
+            The bin size of light curves, the time bins are the same with lightcurve_hist
+
+        detid : array-like (optional)
+            The detector id of events, required if split_box is True
+
+        split_box : bool (optional)
+            Split the light curves by detector boxes (detid <=5, 6-11, >11)
+        """
+        time = np.asarray(time, dtype=np.float64)
+        channel = _native(channel)
+        if split_box:
+            if detid is None:
+                raise IOError("detid data does not loaded, detid is required to split the detector boxes")
+            detid = _native(detid)
+            box_lut = _box_lookup(int(np.max(detid)))
+            nbox = 3
+        else:
+            detid = np.zeros(0, dtype=np.intp)
+            box_lut = np.zeros(1, dtype=np.intp)
+            nbox = 1
+        self.bands, band_lut = _band_lookup(bands, int(np.max(channel)))
+
+        edges = np.arange(np.min(time), np.max(time)+binsize, binsize)
+        self.time = edges[:-1]
+        self.binsize = binsize
+        self.counts = np.zeros((nbox, len(self.bands), len(self.time)), dtype=np.int64)
+        numba_lightcurve_cube(self.counts, time, channel, detid, edges[0], binsize, band_lut, box_lut)
+
+    def band(self, band_num, box=None):
+        """
+        The counts of one energy band (a view of the cube), with shape (box, time),
+        or (time,) if box is specified
+        """
+        if box is None:
+            return self.counts[:, band_num]
+        return self.counts[box, band_num]
+
+    @property
+    def band_sum(self):
+        """
+        The counts summed over all energy bands, with shape (box, time)
+        """
+        return self.counts.sum(axis=1)
+
+    @property
+    def box_sum(self):
+        """
+        The counts summed over all detector boxes, with shape (band, time)
+        """
+        if self.counts.shape[0] == 1:
+            return self.counts[0]
+        return self.counts.sum(axis=0)
+
+    def rate(self):
+        """
+        The count rate of the cube
+        """
+        return self.counts/self.binsize
+
+    def hardness_ratio(self, hard_band, soft_band, box=None):
+        """
+        The hardness ratio of two energy bands, hard/soft.
+        The bins with zero soft counts are set to nan.
+
+        Parameters
+        ---------------
+        hard_band : int
+            The index of hard energy band
+
+        soft_band : int
+            The index of soft energy band
+
+        box : int (optional)
+            The index of detector box, all boxes are summed if box is None
+        """
+        if box is None:
+            hard = self.box_sum[hard_band]
+            soft = self.box_sum[soft_band]
+        else:
+            hard = self.counts[box, hard_band]
+            soft = self.counts[box, soft_band]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(soft > 0, hard/soft, np.nan)
+        return ratio
+
+    def to_lightcurve(self, band_num, box=None, rate=True):
+        """
+        Convert one energy band to lightcurve object, all boxes are summed if box is None.
+        The error of counts is the Poisson error.
+        """
+        if box is None:
+            counts = self.box_sum[band_num]
+        else:
+            counts = self.counts[box, band_num]
+        yerr = np.sqrt(counts)
+        if rate:
+            counts = counts/self.binsize
+            yerr = yerr/self.binsize
+        return lightcurve(self.time, counts, yerr)
+
+
 if __name__ == "__main__":
     x = y = z = np.arange(1,100, 1)
     lc = lightcurve(x, y, z)
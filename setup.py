@@ -13,6 +13,7 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/tuoyl/hxmtpy",
     packages=setuptools.find_packages(),
+    package_data={"hxmtpy": ["refdata/*.json"]},
     install_requires=[
         "numpy",
         "numba",